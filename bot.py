@@ -1,9 +1,15 @@
 import os
 import random
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import atexit
+import heapq
 import json
+import queue
+import re
+import time
 from datetime import datetime
+from typing import NamedTuple
 import asyncio
 from telegram import (
     Update,
@@ -15,6 +21,7 @@ from telegram import (
     Chat,
 )
 from telegram.ext import (
+    AIORateLimiter,
     ApplicationBuilder,
     CommandHandler,
     MessageHandler,
@@ -25,10 +32,17 @@ from telegram.ext import (
 from telegram.ext import CallbackQueryHandler
 from telegram.error import TelegramError
 from storage import ChallengeStorage
-import traceback
 import messages
 from aiohttp import web
 
+# orjson is much faster than stdlib json for structured logging
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Import DeepSeek functionality
 from gpt.deepseek import (
     initialize_deepseek,
@@ -42,6 +56,9 @@ from config import (
     LOG_LEVEL,
     BOT_TOKEN,
     HTTP_PORT,
+    WEBHOOK_URL,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET_TOKEN,
     MAX_ATTEMPTS,
     SPAM_TRACKING_MESSAGES,
     SPAM_TRACKING_DURATION,
@@ -51,9 +68,41 @@ from config import (
 )
 
 
+def _normalize_chat_ids(chat_ids):
+    """Coerce configured chat IDs to ints, skipping malformed entries"""
+    normalized = set()
+    for chat_id in chat_ids:
+        try:
+            normalized.add(int(chat_id))
+        except (ValueError, TypeError):
+            continue
+    return frozenset(normalized)
+
+
+# Allowed chat IDs normalized once at import so the per-update
+# authorization check is a single set membership test
+_ALLOWED_CHAT_ID_SET = _normalize_chat_ids(ALLOWED_CHAT_IDS)
+
+
 class JsonFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging"""
 
+    # formatTime runs localtime+strftime per record; cache the formatted
+    # string per whole second since bursts emit many records per second.
+    # Timestamps are second-resolution (no msec suffix) on purpose so the
+    # cached string is always accurate.
+    _last_sec = None
+    _last_sec_str = ""
+
+    def formatTime(self, record, datefmt=None):
+        sec = int(record.created)
+        if sec != JsonFormatter._last_sec:
+            JsonFormatter._last_sec = sec
+            JsonFormatter._last_sec_str = time.strftime(
+                datefmt or self.default_time_format, self.converter(sec)
+            )
+        return JsonFormatter._last_sec_str
+
     def format(self, record):
         log_data = {
             "timestamp": self.formatTime(record),
@@ -72,24 +121,109 @@ class JsonFormatter(logging.Formatter):
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
 
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(log_data).decode("utf-8")
         return json.dumps(log_data)
 
 
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler with a large write buffer and periodic flush.
+
+    StreamHandler flushes after every record; buffering the stream and
+    flushing at most every ``flush_interval`` seconds coalesces many small
+    log lines into block-sized write() syscalls. Records at ERROR level
+    and above are flushed immediately so failures are never delayed.
+    """
+
+    flush_interval = 30.0  # seconds between flushes of buffered records
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._next_flush = time.monotonic() + self.flush_interval
+        try:
+            self._bytes_written = os.path.getsize(self.baseFilename)
+        except OSError:
+            self._bytes_written = 0
+
+    def shouldRollover(self, record):
+        # Track the file size in-process instead of asking the stream (and
+        # through it the filesystem) for every record. Count encoded bytes,
+        # not code points: the mostly-Cyrillic log text is 2 bytes per
+        # character in UTF-8, so a code-point counter would let files grow
+        # to nearly twice maxBytes before rotating.
+        if self.maxBytes <= 0:
+            return False
+        self._bytes_written += len(self.format(record).encode("utf-8")) + 1
+        return self._bytes_written >= self.maxBytes
+
+    def doRollover(self):
+        super().doRollover()
+        self._bytes_written = 0
+
+    def _open(self):
+        return open(
+            self.baseFilename, self.mode, buffering=65536, encoding=self.encoding
+        )
+
+    def flush(self):
+        now = time.monotonic()
+        if now >= self._next_flush:
+            self._next_flush = now + self.flush_interval
+            super().flush()
+
+    def emit(self, record):
+        super().emit(record)
+        if record.levelno >= logging.ERROR:
+            super().flush()
+
+    def force_flush(self):
+        """Flush immediately, bypassing the interval gate"""
+        self._next_flush = 0.0
+        super().flush()
+
+
+class PassThroughQueueHandler(QueueHandler):
+    """QueueHandler that enqueues records unchanged.
+
+    The stock prepare() pre-formats the record and nulls exc_info so it
+    can be pickled across processes, which would materialize tracebacks
+    on the event loop and hide the structured "exception" field from
+    JsonFormatter. Records here never leave the process (SimpleQueue),
+    so the listener thread can format them as-is.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+# Logs directory next to this file; computed once at import
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+
+# File handlers with delayed flushing, kept so shutdown can force them out
+_buffered_log_handlers = []
+
+
+def flush_log_handlers():
+    """Force buffered log records to disk, e.g. before the process exits"""
+    for handler in _buffered_log_handlers:
+        try:
+            handler.force_flush()
+        except Exception:
+            pass
+
+
 def setup_logging():
     """Initialize logging configuration"""
     # Create logger first
     logger = logging.getLogger(__name__)
     logger.setLevel(LOG_LEVEL)
 
-    # Ensure logs directory exists
-    log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
-    if not os.path.exists(log_dir):
-        try:
-            os.makedirs(log_dir)
-            print(f"Created logs directory at {log_dir}")
-        except Exception as e:
-            print(f"Error creating logs directory: {e}")
-            raise
+    # Ensure logs directory exists (no exists-then-create race)
+    try:
+        os.makedirs(LOG_DIR, exist_ok=True)
+    except OSError as e:
+        print(f"Error creating logs directory: {e}")
+        raise
 
     # Create formatters
     file_formatter = logging.Formatter(
@@ -101,14 +235,16 @@ def setup_logging():
 
     # Setup file handler with rotation
     try:
-        file_handler = RotatingFileHandler(
-            os.path.join(log_dir, "bot.log"),
+        file_handler = BufferedRotatingFileHandler(
+            os.path.join(LOG_DIR, "bot.log"),
             maxBytes=10 * 1024 * 1024,  # 10MB
             backupCount=5,
         )
         file_handler.setFormatter(file_formatter)
-        file_handler.setLevel(LOG_LEVEL)
-        logger.addHandler(file_handler)
+        # The JSON handler already captures everything at LOG_LEVEL; keeping
+        # the plain-text file at WARNING+ avoids writing every record to
+        # disk twice while still leaving a human-readable problem log
+        file_handler.setLevel(logging.WARNING)
     except Exception as e:
         print(f"Error setting up file handler: {e}")
         raise
@@ -117,7 +253,6 @@ def setup_logging():
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(console_formatter)
     console_handler.setLevel(LOG_LEVEL)
-    logger.addHandler(console_handler)
 
     # Setup specific loggers
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -125,19 +260,35 @@ def setup_logging():
 
     # Setup JSON logging
     try:
-        json_handler = RotatingFileHandler(
-            os.path.join(log_dir, "bot_analysis.json"),
+        json_handler = BufferedRotatingFileHandler(
+            os.path.join(LOG_DIR, "bot_analysis.json"),
             maxBytes=10 * 1024 * 1024,  # 10MB
             backupCount=5,
         )
         json_handler.setFormatter(JsonFormatter())
         json_handler.setLevel(LOG_LEVEL)
-        logger.addHandler(json_handler)
-        print(f"Logging setup complete. Log files will be written to {log_dir}")
+        print(f"Logging setup complete. Log files will be written to {LOG_DIR}")
     except Exception as e:
         print(f"Error setting up JSON handler: {e}")
         raise
 
+    # Route all records through a queue so handler I/O (disk writes,
+    # rotation checks) happens on a background thread instead of the
+    # asyncio event loop
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(PassThroughQueueHandler(log_queue))
+    listener = QueueListener(
+        log_queue,
+        file_handler,
+        console_handler,
+        json_handler,
+        respect_handler_level=True,
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
+    _buffered_log_handlers.extend([file_handler, json_handler])
+
     return logger
 
 
@@ -157,20 +308,97 @@ logger.info(messages.WORKING_DIR_MESSAGE.format(working_dir=os.getcwd()))
 # Initialize storage
 storage = ChallengeStorage()
 
-# Global variable to track bot health
-bot_health = {
-    "status": "starting",
-    "start_time": datetime.now(),
-    "last_update": datetime.now(),
-    "challenges_processed": 0,
-    "errors_count": 0,
-}
+# Immutable permission sets used on every join/correct answer; built once
+# instead of per call
+RESTRICTED_PERMISSIONS = ChatPermissions(can_send_messages=False)
+UNRESTRICTED_PERMISSIONS = ChatPermissions(
+    can_send_messages=True,
+    can_send_other_messages=True,
+    can_add_web_page_previews=True,
+)
+
+# Dedicated RNG for challenge generation; the bot is single-threaded
+# asyncio, so it doesn't need the shared module-level generator
+_rng = random.Random()
+
+# Caps in-flight join processing; created on the bot's loop in post_init
+JOIN_SEMAPHORE_LIMIT = 20
+JOIN_SEMAPHORE = None
+
+# Update types the bot subscribes to and the composite filter for the
+# spam-detection text handler, built once at import instead of per setup
+ALLOWED_UPDATE_TYPES = [
+    Update.MESSAGE,
+    Update.CHAT_MEMBER,
+    Update.MY_CHAT_MEMBER,
+    Update.CALLBACK_QUERY,
+]
+SPAM_TEXT_FILTER = filters.ChatType.GROUPS & filters.TEXT & ~filters.COMMAND
+
+# Spam prefilter: short messages with no link, handle, or phone number are
+# never spam in practice, so they skip the DeepSeek call entirely
+SPAM_SUSPECT_RE = re.compile(r"https?://|t\.me/|@\w{5,}|\+\d{10}", re.IGNORECASE)
+SPAM_MIN_MESSAGE_LENGTH = 20
+
+# Compiled once and shared between the CallbackQueryHandler pattern and
+# the handler itself, so invalid payloads are rejected before dispatch
+ANSWER_CALLBACK_RE = re.compile(r"^answer_(-?\d+)_(\d+)_(\d+)$")
+
+# Cache of chat types keyed by chat_id so each join doesn't pay a
+# get_chat round-trip; chat types essentially never change
+CHAT_TYPE_CACHE_TTL = 3600  # seconds
+_chat_type_cache = {}
+
+
+async def get_chat_type(bot, chat_id: int) -> str:
+    """Get the chat type, using a TTL cache to avoid repeated API calls"""
+    cached = _chat_type_cache.get(chat_id)
+    now = time.monotonic()
+    if cached and now - cached[1] < CHAT_TYPE_CACHE_TTL:
+        return cached[0]
+
+    chat = await bot.get_chat(chat_id)
+    _chat_type_cache[chat_id] = (chat.type, now)
+    return chat.type
+
+
+# Offset for converting stored monotonic stamps back to wall-clock time
+_MONOTONIC_TO_WALL = time.time() - time.monotonic()
+
+
+class BotHealth:
+    """Mutable bot health stats; slots keep attribute access cheap"""
+
+    __slots__ = (
+        "status",
+        "start_monotonic",
+        "last_update_monotonic",
+        "challenges_processed",
+        "errors_count",
+    )
+
+    def __init__(self):
+        self.status = "starting"
+        self.start_monotonic = time.monotonic()
+        self.last_update_monotonic = time.monotonic()
+        self.challenges_processed = 0
+        self.errors_count = 0
+
+
+# Global object to track bot health; timestamps are monotonic floats
+# (cheap to update on hot paths) and only formatted when /health is read
+bot_health = BotHealth()
+
+
+def _monotonic_to_datetime(stamp: float) -> datetime:
+    """Convert a stored monotonic stamp to a wall-clock datetime"""
+    return datetime.fromtimestamp(stamp + _MONOTONIC_TO_WALL)
 
 
 def is_chat_authorized(update: Update) -> bool:
     """Check if a chat is authorized to use the bot"""
     # If no restrictions are set, allow all chats
-    if not ALLOWED_CHAT_IDS:
+    if not _ALLOWED_CHAT_ID_SET:
         return True
 
     # Get chat ID
@@ -183,50 +411,59 @@ def is_chat_authorized(update: Update) -> bool:
         return True
 
     # Check if group/channel chat_id is in allowed list
-    for allowed_id in ALLOWED_CHAT_IDS:
-        try:
-            if int(allowed_id) == int(chat_id):
-                return True
-        except (ValueError, TypeError):
-            continue
+    if chat_id in _ALLOWED_CHAT_ID_SET:
+        return True
 
-    # Log unauthorized access attempt (but do nothing else)
-    logger.debug(
-        messages.UNAUTHORIZED_CHAT_IGNORED.format(chat_id=chat_id),
-        extra={
-            "chat_id": chat_id,
-            "chat_title": update.effective_chat.title
-            if update.effective_chat
-            else None,
-            "event_type": "unauthorized_ignored",
-        },
-    )
+    # Log unauthorized access attempt (but do nothing else); guard so
+    # the reject path builds nothing when DEBUG is filtered out
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            messages.UNAUTHORIZED_CHAT_IGNORED.format(chat_id=chat_id),
+            extra={
+                "chat_id": chat_id,
+                "chat_title": update.effective_chat.title,
+                "event_type": "unauthorized_ignored",
+            },
+        )
 
     return False
 
 
+# Static healthcheck fields computed once; orchestrators poll /health
+# every few seconds, so only the dynamic fields are rebuilt per probe
+_HEALTH_STATIC = {
+    "start_time": _monotonic_to_datetime(bot_health.start_monotonic).isoformat(),
+    "version": "1.0.0",
+}
+
+
 async def healthcheck_handler(request):
     """HTTP healthcheck endpoint"""
-    uptime = datetime.now() - bot_health["start_time"]
-
     health_data = {
-        "status": bot_health["status"],
-        "uptime_seconds": int(uptime.total_seconds()),
-        "start_time": bot_health["start_time"].isoformat(),
-        "last_update": bot_health["last_update"].isoformat(),
-        "challenges_processed": bot_health["challenges_processed"],
-        "errors_count": bot_health["errors_count"],
-        "version": "1.0.0",
+        "status": bot_health.status,
+        "uptime_seconds": int(time.monotonic() - bot_health.start_monotonic),
+        "last_update": _monotonic_to_datetime(
+            bot_health.last_update_monotonic
+        ).isoformat(),
+        "challenges_processed": bot_health.challenges_processed,
+        "errors_count": bot_health.errors_count,
+        **_HEALTH_STATIC,
     }
 
     # Determine HTTP status based on bot health
-    if bot_health["status"] == "running":
+    if bot_health.status == "running":
         status = 200
-    elif bot_health["status"] == "starting":
+    elif bot_health.status == "starting":
         status = 503  # Service Unavailable
     else:
         status = 500  # Internal Server Error
 
+    if ORJSON_AVAILABLE:
+        return web.Response(
+            body=orjson.dumps(health_data),
+            status=status,
+            content_type="application/json",
+        )
     return web.json_response(health_data, status=status)
 
 
@@ -248,7 +485,7 @@ async def create_http_server():
             }
         )
 
-        app.router.add_get("/", root_handler)
+    app.router.add_get("/", root_handler)
 
     return app
 
@@ -269,30 +506,46 @@ async def handle_user_message(update: Update, context: ContextTypes.DEFAULT_TYPE
     chat_id = update.effective_chat.id
     message_text = update.message.text
 
-    logger.debug(
-        f"📝 Received message from user {user_id} in chat {chat_id}: '{message_text[:50]}...'"
-    )
+    # Fast in-memory rejection: most group traffic comes from users who
+    # are not under spam tracking, so skip all further work for them
+    if not storage.is_tracked(chat_id, user_id):
+        return
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "📝 Received message from user %s in chat %s: '%s...'",
+            user_id,
+            chat_id,
+            message_text[:50],
+        )
 
     try:
         # Skip if spam detection is disabled
         if not is_deepseek_available():
             logger.debug(
-                f"🚫 DeepSeek client not available - skipping spam detection for user {user_id}"
+                "🚫 DeepSeek client not available - skipping spam detection for user %s",
+                user_id,
             )
             return
 
         # Check if this user is being tracked for spam detection
-        tracked_user = storage.get_tracked_user(chat_id, user_id)
+        tracked_user = await asyncio.to_thread(
+            storage.get_tracked_user, chat_id, user_id
+        )
         if not tracked_user:
             logger.debug(
-                f"👤 User {user_id} not being tracked for spam detection in chat {chat_id}"
+                "👤 User %s not being tracked for spam detection in chat %s",
+                user_id,
+                chat_id,
             )
             return  # User not being tracked
 
-        logger.debug(f"🔍 User {user_id} is being tracked - checking for spam...")
+        logger.debug("🔍 User %s is being tracked - checking for spam...", user_id)
 
         # Increment message count
-        message_count = storage.increment_user_messages(chat_id, user_id)
+        message_count = await asyncio.to_thread(
+            storage.increment_user_messages, chat_id, user_id
+        )
         if message_count == -1:
             return  # User tracking expired
 
@@ -301,11 +554,23 @@ async def handle_user_message(update: Update, context: ContextTypes.DEFAULT_TYPE
             f"from user {user_id} in chat {chat_id}"
         )
 
-        # Check if message is spam
-        logger.debug(
-            f"🤖 Analyzing message {message_count}/{SPAM_TRACKING_MESSAGES} with DeepSeek..."
-        )
-        is_spam = await detect_spam_with_deepseek(message_text)
+        # Check if message is spam; obviously harmless messages (short,
+        # no URL/handle/phone) short-circuit without an API call
+        if len(message_text) < SPAM_MIN_MESSAGE_LENGTH and not SPAM_SUSPECT_RE.search(
+            message_text
+        ):
+            logger.debug(
+                "✅ Message from user %s too short/plain to be spam - skipping DeepSeek",
+                user_id,
+            )
+            is_spam = False
+        else:
+            logger.debug(
+                "🤖 Analyzing message %s/%s with DeepSeek...",
+                message_count,
+                SPAM_TRACKING_MESSAGES,
+            )
+            is_spam = await detect_spam_with_deepseek(message_text)
 
         if is_spam:
             # Spam detected - kick and ban user
@@ -314,7 +579,7 @@ async def handle_user_message(update: Update, context: ContextTypes.DEFAULT_TYPE
             )
 
             # Remove from tracking
-            storage.remove_tracked_user(chat_id, user_id)
+            await asyncio.to_thread(storage.remove_tracked_user, chat_id, user_id)
 
             logger.warning(
                 f"🚨 SPAM DETECTED: Banned user {user_id} in chat {chat_id} "
@@ -323,7 +588,7 @@ async def handle_user_message(update: Update, context: ContextTypes.DEFAULT_TYPE
 
         elif message_count >= SPAM_TRACKING_MESSAGES:
             # Reached message limit without spam - stop tracking
-            storage.remove_tracked_user(chat_id, user_id)
+            await asyncio.to_thread(storage.remove_tracked_user, chat_id, user_id)
             logger.info(
                 f"✅ User {user_id} in chat {chat_id} passed spam check "
                 f"({SPAM_TRACKING_MESSAGES} messages)"
@@ -335,6 +600,51 @@ async def handle_user_message(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
 
 
+# Ban notices are coalesced per chat: during a spam raid one aggregated
+# message per window replaces a send_message per ban, saving a third of
+# the API calls each ban would otherwise cost
+SPAM_NOTIFY_INTERVAL = 10.0  # min seconds between ban notices per chat
+_spam_notify = {}  # chat_id -> [last_sent_monotonic, pending_count, scheduled]
+
+
+async def _flush_spam_notice(bot, chat_id: int):
+    """Send one notice covering every ban recorded since the last flush"""
+    state = _spam_notify.get(chat_id)
+    if not state or not state[1]:
+        return
+    count, state[0], state[1], state[2] = state[1], time.monotonic(), 0, False
+    text = (
+        messages.SPAM_DETECTED_KICK
+        if count == 1
+        else messages.SPAM_DETECTED_KICK_MANY.format(count=count)
+    )
+    try:
+        await bot.send_message(chat_id=chat_id, text=text, disable_notification=True)
+    except TelegramError as e:
+        logger.warning(f"Could not send spam ban notice: {str(e)}")
+
+
+async def _flush_spam_notice_later(bot, chat_id: int, delay: float):
+    await asyncio.sleep(delay)
+    await _flush_spam_notice(bot, chat_id)
+
+
+async def _notify_spam_ban(context: ContextTypes.DEFAULT_TYPE, chat_id: int):
+    """Record a ban and notify the chat, rate-limited per chat"""
+    state = _spam_notify.setdefault(chat_id, [0.0, 0, False])
+    state[1] += 1
+    if state[2]:
+        return  # a flush is already scheduled for this chat
+    wait = state[0] + SPAM_NOTIFY_INTERVAL - time.monotonic()
+    if wait <= 0:
+        await _flush_spam_notice(context.bot, chat_id)
+    else:
+        state[2] = True
+        # Plain task instead of a JobQueue entry: APScheduler bookkeeping
+        # is overkill for a one-shot few-second timer
+        _spawn_action(_flush_spam_notice_later(context.bot, chat_id, wait))
+
+
 async def kick_and_ban_spammer(
     context: ContextTypes.DEFAULT_TYPE,
     chat_id: int,
@@ -342,26 +652,19 @@ async def kick_and_ban_spammer(
     message_id: int = None,
 ):
     """Kick and ban a user detected as spammer"""
-    try:
-        # Delete the spam message if provided
-        if message_id:
-            try:
-                await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
-            except TelegramError as e:
-                logger.warning(f"Could not delete spam message: {str(e)}")
-
-        # Ban the user (kick + prevent rejoining)
-        await context.bot.ban_chat_member(chat_id, user_id)
-
-        # Send notification to chat
-        await context.bot.send_message(
-            chat_id=chat_id, text=messages.SPAM_DETECTED_KICK, disable_notification=True
-        )
-
-        logger.info(f"Successfully banned spammer {user_id} from chat {chat_id}")
-
-    except TelegramError as e:
-        logger.error(f"Error banning spammer: {str(e)}")
+    # Ban the user (kick + prevent rejoining) and delete the spam
+    # message concurrently - the calls are independent, so overlapping
+    # them saves a Bot API round-trip on the spam path
+    coros = [context.bot.ban_chat_member(chat_id, user_id)]
+    if message_id:
+        coros.append(context.bot.delete_message(chat_id=chat_id, message_id=message_id))
+    results = await asyncio.gather(*coros, return_exceptions=True)
+
+    if len(results) > 1 and isinstance(results[1], BaseException):
+        logger.warning(f"Could not delete spam message: {results[1]}")
+
+    if isinstance(results[0], BaseException):
+        logger.error(f"Error banning spammer: {results[0]}")
         # Try to send error message to chat
         try:
             await context.bot.send_message(
@@ -371,53 +674,65 @@ async def kick_and_ban_spammer(
             )
         except Exception:
             pass
+        return
+
+    # Notify the chat (coalesced per chat during raids)
+    await _notify_spam_ban(context, chat_id)
+
+    logger.info("Successfully banned spammer %s from chat %s", user_id, chat_id)
+
+
+class EmojiChallenge(NamedTuple):
+    """Immutable challenge entry; attribute access beats dict keys"""
+
+    question: str
+    correct: str
+    wrong_options: tuple
+
+
+# messages.py stays a plain editable list (it doubles as the language
+# file); freeze it once at import into a tuple of NamedTuples so the
+# per-join pick allocates nothing beyond the options list
+_CHALLENGE_POOL = tuple(
+    EmojiChallenge(c["question"], c["correct"], tuple(c["wrong_options"]))
+    for c in messages.EMOJI_CHALLENGES
+)
 
 
 def generate_emoji_challenge():
     """Generate an emoji challenge with question and 4 options"""
-    # Pick a random challenge from messages
-    challenge = random.choice(messages.EMOJI_CHALLENGES)
+    # Pick a random challenge from the frozen pool
+    challenge = _rng.choice(_CHALLENGE_POOL)
 
-    # Create options list with correct answer and wrong options
-    options = [challenge["correct"]] + challenge["wrong_options"]
-    random.shuffle(options)
-
-    # Find the correct answer index (0-3)
-    correct_index = options.index(challenge["correct"])
+    # Shuffle all four options: inserting only the correct answer at a
+    # random slot would leave the wrong options in their fixed order,
+    # letting a bot that sees a repeated question identify the answer
+    options = [challenge.correct, *challenge.wrong_options]
+    _rng.shuffle(options)
+    correct_index = options.index(challenge.correct)
 
     return {
-        "question": challenge["question"],
+        "question": challenge.question,
         "options": options,
         "correct_answer": correct_index,  # Index of correct option (0-3)
     }
 
 
+# Statuses meaning the user is no longer in the chat
+GONE_STATUSES = frozenset({"left", "kicked"})
+
+
 async def restrict_new_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle new chat members and member status changes"""
-    logger.debug(
-        f"Received update type: {update.message and 'message' or 'chat_member'}"
-    )
+    """Handle member status changes for new and leaving members"""
+    # Bots never get challenges; drop their updates before any other work
+    if update.chat_member and update.chat_member.new_chat_member.user.is_bot:
+        return
 
     # Check if chat is authorized - ignore if not
     if not is_chat_authorized(update):
         return
 
-    if update.message and update.message.new_chat_members:
-        # Handle new_chat_members update
-        for new_member in update.message.new_chat_members:
-            if new_member.is_bot:
-                continue
-
-            user = new_member
-            chat_id = update.effective_chat.id
-
-            logger.info(
-                f"Processing new member {user.full_name} in "
-                f"chat {chat_id} (from message update)"
-            )
-            await process_new_member(update, context, chat_id, user)
-
-    elif update.chat_member:
+    if update.chat_member:
         # Handle chat_member update
         chat_member_update = update.chat_member
         old_status = chat_member_update.old_chat_member.status
@@ -426,49 +741,50 @@ async def restrict_new_member(update: Update, context: ContextTypes.DEFAULT_TYPE
         chat_id = update.effective_chat.id
 
         logger.debug(
-            f"Chat member update received:\n"
-            f"Chat ID: {chat_id}\n"
-            f"User: {user.full_name} (ID: {user.id})\n"
-            f"Old status: {old_status}\n"
-            f"New status: {new_status}"
+            "Chat member update received: chat=%s user=%s (ID: %s) old=%s new=%s",
+            chat_id,
+            user.full_name,
+            user.id,
+            old_status,
+            new_status,
         )
 
-        if (
-            old_status in ["left", "kicked"]
-            and new_status == "member"
-            and not user.is_bot
-        ):
+        if old_status in GONE_STATUSES and new_status == "member":
             logger.info(
                 f"Processing new member {user.full_name} in "
                 f"chat {chat_id} (from chat_member update)"
             )
-            await process_new_member(update, context, chat_id, user)
-        elif new_status in ["left", "kicked"] and not user.is_bot:
-            # User left or was kicked, clean up their challenges
-            challenges = storage.get_user_challenges(chat_id, user.id)
-            for challenge in challenges:
+            # Bounded so a flash-crowd of joins queues here instead of
+            # exhausting the Bot API connection pool
+            async with JOIN_SEMAPHORE:
+                await process_new_member(update, context, chat_id, user)
+        elif new_status in GONE_STATUSES:
+            # User left or was kicked, clean up their challenges with one
+            # bulk deleteMessages request instead of one call per message
+            challenges = await asyncio.to_thread(
+                storage.get_user_challenges, chat_id, user.id
+            )
+            if challenges:
+                message_ids = [challenge.message_id for challenge in challenges]
                 try:
-                    # Delete the challenge message
-                    await context.bot.delete_message(
-                        chat_id=challenge["chat_id"], message_id=challenge["message_id"]
+                    await context.bot.delete_messages(
+                        chat_id=chat_id, message_ids=message_ids
                     )
                 except TelegramError as e:
                     logger.warning(
-                        f"Could not delete challenge message for leaving user: {str(e)}",
+                        f"Could not delete challenge messages for leaving user: {str(e)}",
                         extra={
                             "chat_id": chat_id,
                             "user_id": user.id,
-                            "message_id": challenge["message_id"],
                             "event_type": "delete_failed",
                         },
                     )
-                storage.remove_challenge(challenge["message_id"])
+                await asyncio.to_thread(storage.remove_challenges, message_ids)
                 logger.info(
-                    "Cleaned up challenge for leaving user",
+                    "Cleaned up challenges for leaving user",
                     extra={
                         "chat_id": chat_id,
                         "user_id": user.id,
-                        "message_id": challenge["message_id"],
                         "event_type": "challenge_cleanup",
                     },
                 )
@@ -482,12 +798,12 @@ async def process_new_member(
     """Process a new member joining the chat"""
     try:
         # Update health stats
-        bot_health["last_update"] = datetime.now()
-        bot_health["challenges_processed"] += 1
+        bot_health.last_update_monotonic = time.monotonic()
+        bot_health.challenges_processed += 1
 
         # Check if this is a supergroup
-        chat = await context.bot.get_chat(chat_id)
-        if chat.type != Chat.SUPERGROUP:
+        chat_type = await get_chat_type(context.bot, chat_id)
+        if chat_type != Chat.SUPERGROUP:
             logger.warning(
                 f"Chat {chat_id} is not a supergroup, " f"can't restrict members"
             )
@@ -496,34 +812,33 @@ async def process_new_member(
 
         # Clean up any existing challenges for this user in this chat
         # Delete old challenges silently instead of showing expired message
-        existing_challenges = storage.get_user_challenges(chat_id, user.id)
-        for challenge in existing_challenges:
+        existing_challenges = await asyncio.to_thread(
+            storage.get_user_challenges, chat_id, user.id
+        )
+        if existing_challenges:
+            # Delete old challenges immediately without showing expired
+            # message; all of them live in this chat, so one bulk
+            # deleteMessages round-trip covers the lot
+            message_ids = [old.message_id for old in existing_challenges]
             try:
-                # Delete old challenge immediately without showing expired message
-                await context.bot.delete_message(
-                    chat_id=challenge["chat_id"], message_id=challenge["message_id"]
+                await context.bot.delete_messages(
+                    chat_id=chat_id, message_ids=message_ids
                 )
                 logger.info(
-                    "Deleted old challenge for rejoining user",
+                    "Deleted old challenges for rejoining user",
                     extra={
                         "chat_id": chat_id,
                         "user_id": user.id,
-                        "message_id": challenge["message_id"],
                         "event_type": "old_challenge_deleted",
                     },
                 )
             except TelegramError as e:
-                logger.debug(f"Could not delete old challenge: {str(e)}")
-            storage.remove_challenge(challenge["message_id"])
-
-        # Small delay to ensure old messages are cleaned up before sending new challenge
-        if existing_challenges:
-            await asyncio.sleep(0.5)
+                logger.debug("Could not delete old challenges: %s", e)
+            await asyncio.to_thread(storage.remove_challenges, message_ids)
 
         # Restrict user to read-only
-        permissions = ChatPermissions(can_send_messages=False)
         await context.bot.restrict_chat_member(
-            chat_id, user.id, permissions=permissions
+            chat_id, user.id, permissions=RESTRICTED_PERMISSIONS
         )
         logger.info(
             f"Restricted user {user.full_name}",
@@ -537,19 +852,14 @@ async def process_new_member(
         # Generate emoji challenge
         challenge = generate_emoji_challenge()
 
-        # Create inline keyboard
-        keyboard = []
-        row = []
-        for i, option in enumerate(challenge["options"]):
-            callback_data = (
-                f"answer_{chat_id}_{user.id}_{i}"  # Use index instead of value
-            )
-            row.append(InlineKeyboardButton(option, callback_data=callback_data))
-            if len(row) == 2:
-                keyboard.append(row)
-                row = []
-        if row:
-            keyboard.append(row)
+        # Create inline keyboard: compute the invariant callback prefix
+        # once and lay the four options out two per row
+        prefix = f"answer_{chat_id}_{user.id}_"  # Use index instead of value
+        buttons = [
+            InlineKeyboardButton(option, callback_data=prefix + str(i))
+            for i, option in enumerate(challenge["options"])
+        ]
+        keyboard = [buttons[:2], buttons[2:]]
 
         reply_markup = InlineKeyboardMarkup(keyboard)
         challenge_text = messages.WELCOME_CHALLENGE.format(
@@ -564,10 +874,11 @@ async def process_new_member(
             disable_notification=True,
         )
         message_id = sent_message.message_id
-        logger.debug(f"Sent challenge message: {message_id}")
+        logger.debug("Sent challenge message: %s", message_id)
 
         # Store challenge
-        storage.add_challenge(
+        await asyncio.to_thread(
+            storage.add_challenge,
             message_id=message_id,
             chat_id=chat_id,
             user_id=user.id,
@@ -575,11 +886,9 @@ async def process_new_member(
         )
 
         # Set up challenge timeout timer
-        context.job_queue.run_once(
-            kick_user_job, CHALLENGE_TIMEOUT, data={"message_id": message_id}
-        )
+        schedule_kick(message_id, chat_id, time.monotonic() + CHALLENGE_TIMEOUT)
 
-        logger.info(f"Set up challenge for user {user.id} with message {message_id}")
+        logger.info("Set up challenge for user %s with message %s", user.id, message_id)
 
     except TelegramError as e:
         logger.error(
@@ -602,19 +911,21 @@ async def handle_answer_callback(update: Update, context: ContextTypes.DEFAULT_T
 
     query = update.callback_query
     message_id = query.message.message_id
-    logger.debug(
-        f"Received callback query",
-        extra={
-            "message_id": message_id,
-            "callback_data": query.data,
-            "user_id": query.from_user.id,
-            "event_type": "answer_attempt",
-        },
-    )
+    # Guard so the extra dict isn't allocated when DEBUG is filtered out
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Received callback query",
+            extra={
+                "message_id": message_id,
+                "callback_data": query.data,
+                "user_id": query.from_user.id,
+                "event_type": "answer_attempt",
+            },
+        )
 
     try:
         # Get challenge by message_id
-        challenge = storage.get_challenge(message_id)
+        challenge = await asyncio.to_thread(storage.get_challenge, message_id)
         if not challenge:
             logger.warning(
                 f"No challenge found",
@@ -623,9 +934,13 @@ async def handle_answer_callback(update: Update, context: ContextTypes.DEFAULT_T
             await query.answer(messages.ERR_CHALLENGE_EXPIRED, show_alert=True)
             return
 
-        # Parse callback data
-        parts = query.data.split("_")
-        if len(parts) != 4:
+        # Parse callback data; the CallbackQueryHandler pattern already
+        # ran this regex, so reuse its match instead of matching twice
+        if context.matches:
+            match = context.matches[0]
+        else:
+            match = ANSWER_CALLBACK_RE.match(query.data)
+        if not match:
             logger.warning(
                 f"Invalid callback data format",
                 extra={
@@ -636,15 +951,14 @@ async def handle_answer_callback(update: Update, context: ContextTypes.DEFAULT_T
             await query.answer(messages.ERR_INVALID_CALLBACK, show_alert=True)
             return
 
-        _, chat_id, user_id, answer = parts
-        chat_id, user_id, answer = int(chat_id), int(user_id), int(answer)
+        chat_id, user_id, answer = map(int, match.groups())
 
         # Verify this is the user who should answer
-        if query.from_user.id != challenge["user_id"]:
+        if query.from_user.id != challenge.user_id:
             logger.warning(
                 f"Wrong user tried to answer",
                 extra={
-                    "expected_user_id": challenge["user_id"],
+                    "expected_user_id": challenge.user_id,
                     "actual_user_id": query.from_user.id,
                     "event_type": "wrong_user_answer",
                 },
@@ -652,17 +966,18 @@ async def handle_answer_callback(update: Update, context: ContextTypes.DEFAULT_T
             await query.answer(messages.ERR_CHALLENGE_NOT_FOR_YOU, show_alert=True)
             return
 
-        logger.debug(
-            f"Processing answer",
-            extra={
-                "user_id": user_id,
-                "answer": answer,
-                "expected_answer": challenge["answer"],
-                "event_type": "processing_answer",
-            },
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Processing answer",
+                extra={
+                    "user_id": user_id,
+                    "answer": answer,
+                    "expected_answer": challenge.answer,
+                    "event_type": "processing_answer",
+                },
+            )
 
-        if answer == challenge["answer"]:
+        if answer == challenge.answer:
             logger.info(
                 f"Correct answer received",
                 extra={
@@ -673,13 +988,8 @@ async def handle_answer_callback(update: Update, context: ContextTypes.DEFAULT_T
                 },
             )
             # Correct answer - unrestrict user
-            permissions = ChatPermissions(
-                can_send_messages=True,
-                can_send_other_messages=True,
-                can_add_web_page_previews=True,
-            )
             await context.bot.restrict_chat_member(
-                chat_id, user_id, permissions=permissions
+                chat_id, user_id, permissions=UNRESTRICTED_PERMISSIONS
             )
 
             # Update challenge message to welcome message
@@ -694,27 +1004,31 @@ async def handle_answer_callback(update: Update, context: ContextTypes.DEFAULT_T
             )
 
             # Schedule deletion of welcome message after challenge timeout
-            context.job_queue.run_once(
-                delete_welcome_message_job,
-                CHALLENGE_TIMEOUT,
-                data={"message_id": message_id, "chat_id": chat_id},
-            )
+            schedule_delete(chat_id, message_id, time.monotonic() + CHALLENGE_TIMEOUT)
 
             # Cleanup
-            storage.remove_challenge(message_id)
+            await asyncio.to_thread(storage.remove_challenge, message_id)
 
             # Add user to spam tracking if enabled
             if is_deepseek_available():
-                storage.add_tracked_user(chat_id, user_id, SPAM_TRACKING_DURATION)
+                await asyncio.to_thread(
+                    storage.add_tracked_user, chat_id, user_id, SPAM_TRACKING_DURATION
+                )
                 logger.info(
-                    f"✅ Added user {user_id} to spam tracking in chat {chat_id} for {SPAM_TRACKING_DURATION}s"
+                    "✅ Added user %s to spam tracking in chat %s for %ss",
+                    user_id,
+                    chat_id,
+                    SPAM_TRACKING_DURATION,
                 )
                 logger.debug(
-                    f"🔍 User {user_id} will be monitored for next {SPAM_TRACKING_MESSAGES} messages"
+                    "🔍 User %s will be monitored for next %s messages",
+                    user_id,
+                    SPAM_TRACKING_MESSAGES,
                 )
             else:
                 logger.debug(
-                    f"🚫 DeepSeek not available - user {user_id} not added to spam tracking"
+                    "🚫 DeepSeek not available - user %s not added to spam tracking",
+                    user_id,
                 )
 
             # No personal popup - only welcome message in chat
@@ -726,13 +1040,13 @@ async def handle_answer_callback(update: Update, context: ContextTypes.DEFAULT_T
                     "chat_id": chat_id,
                     "message_id": message_id,
                     "answer": answer,
-                    "expected_answer": challenge["answer"],
+                    "expected_answer": challenge.answer,
                     "event_type": "wrong_answer",
                 },
             )
 
             # Increment attempt count
-            attempts = storage.increment_attempts(message_id)
+            attempts = await asyncio.to_thread(storage.increment_attempts, message_id)
             remaining_attempts = MAX_ATTEMPTS - attempts
 
             logger.info(
@@ -773,7 +1087,7 @@ async def handle_answer_callback(update: Update, context: ContextTypes.DEFAULT_T
             },
             exc_info=True,
         )
-        await query.answer(ERR_GENERIC, show_alert=True)
+        await query.answer(messages.ERR_GENERIC, show_alert=True)
     except TelegramError as e:
         logger.error(
             f"Telegram error: {str(e)}",
@@ -784,66 +1098,154 @@ async def handle_answer_callback(update: Update, context: ContextTypes.DEFAULT_T
             },
             exc_info=True,
         )
-        await query.answer(ERR_GENERIC, show_alert=True)
+        await query.answer(messages.ERR_GENERIC, show_alert=True)
 
 
-async def kick_user_job(context: ContextTypes.DEFAULT_TYPE):
-    """Handle timeout for challenge"""
-    message_id = context.job.data["message_id"]
+# Pending timed actions as a (deadline, action, chat_id, message_id)
+# min-heap drained by a single sweeper task. One task sleeping until the
+# nearest deadline replaces a scheduler job per challenge and per delayed
+# deletion, which keeps join storms cheap: inserts are O(log n) and there
+# is no per-entry timer object. Kick cancellation stays implicit — an
+# answered challenge is gone from storage by the time its deadline pops,
+# so the sweeper just skips it.
+KICK_ACTION = "kick"
+DELETE_ACTION = "delete"
+
+_timer_heap = []
+_timer_wakeup = None  # asyncio.Event, created on the bot's loop by the sweeper
+
+
+def _schedule_action(deadline: float, action: str, chat_id: int, message_id: int):
+    heapq.heappush(_timer_heap, (deadline, action, chat_id, message_id))
+    if _timer_wakeup is not None:
+        _timer_wakeup.set()
+
 
+def schedule_kick(message_id: int, chat_id: int, deadline: float):
+    """Queue a challenge kick for the sweeper at a monotonic deadline"""
+    _schedule_action(deadline, KICK_ACTION, chat_id, message_id)
+
+
+def schedule_delete(chat_id: int, message_id: int, deadline: float):
+    """Queue a message deletion for the sweeper at a monotonic deadline"""
+    _schedule_action(deadline, DELETE_ACTION, chat_id, message_id)
+
+
+# Strong references to in-flight sweeper actions so they are not
+# garbage-collected before completing
+_sweeper_actions = set()
+
+
+def _spawn_action(coro):
+    """Run an expired action as its own task so the sweeper never
+    serializes simultaneous expirations behind one another"""
+    task = asyncio.create_task(coro)
+    _sweeper_actions.add(task)
+    task.add_done_callback(_sweeper_actions.discard)
+
+
+async def timer_sweeper(application):
+    """Single long-lived task firing kicks and deletions as they expire"""
+    global _timer_wakeup
+    _timer_wakeup = asyncio.Event()
+    logger.debug("Timer sweeper started")
+    while True:
+        if not _timer_heap:
+            await _timer_wakeup.wait()
+            _timer_wakeup.clear()
+            continue
+        delay = _timer_heap[0][0] - time.monotonic()
+        if delay > 0:
+            # Sleep until the nearest deadline, but wake early if an
+            # entry with an earlier deadline is pushed
+            try:
+                await asyncio.wait_for(_timer_wakeup.wait(), timeout=delay)
+                _timer_wakeup.clear()
+            except asyncio.TimeoutError:
+                pass
+            continue
+        _, action, chat_id, message_id = heapq.heappop(_timer_heap)
+        if action == KICK_ACTION:
+            _spawn_action(kick_user_job(application.bot, message_id))
+        else:
+            _spawn_action(delete_welcome_message(application.bot, chat_id, message_id))
+
+
+async def _kick_member(bot, chat_id: int, user_id: int, message_id: int) -> bool:
+    """Ban then immediately unban so the user is removed but can rejoin.
+
+    Returns True when the user was removed; an unban failure is logged
+    but still counts as a kick.
+    """
+    try:
+        await bot.ban_chat_member(chat_id, user_id)
+    except TelegramError as e:
+        logger.error(
+            f"Failed to kick user: {str(e)}",
+            extra={
+                "chat_id": chat_id,
+                "user_id": user_id,
+                "message_id": message_id,
+                "event_type": "kick_failed",
+                "error_type": type(e).__name__,
+            },
+        )
+        return False
+    try:
+        await bot.unban_chat_member(chat_id, user_id, only_if_banned=True)
+    except TelegramError as e:
+        logger.error(
+            f"Failed to unban kicked user: {str(e)}",
+            extra={
+                "chat_id": chat_id,
+                "user_id": user_id,
+                "message_id": message_id,
+                "event_type": "unban_failed",
+                "error_type": type(e).__name__,
+            },
+        )
+    return True
+
+
+async def kick_user_job(bot, message_id: int):
+    """Handle timeout for challenge"""
     try:
-        challenge = storage.get_challenge(message_id)
+        # One storage round-trip: the row is gone either way once the
+        # deadline fires (failed kicks were only ever swept up later by
+        # cleanup_expired, never retried)
+        challenge = await asyncio.to_thread(storage.pop_challenge, message_id)
         if not challenge:
             return
 
-        # First kick the user with proper error handling
-        try:
-            await context.bot.ban_chat_member(
-                challenge["chat_id"], challenge["user_id"]
-            )
-            await context.bot.unban_chat_member(
-                challenge["chat_id"], challenge["user_id"]
-            )
-            logger.info(
-                "User kicked due to timeout",
-                extra={
-                    "chat_id": challenge["chat_id"],
-                    "user_id": challenge["user_id"],
-                    "message_id": message_id,
-                    "event_type": "challenge_timeout",
-                },
-            )
-        except TelegramError as e:
-            logger.error(
-                f"Failed to kick user: {str(e)}",
+        # The kick and the challenge-message deletion are independent,
+        # so overlap them
+        kicked, delete_result = await asyncio.gather(
+            _kick_member(bot, challenge.chat_id, challenge.user_id, message_id),
+            _delete_message_once(bot, challenge.chat_id, challenge.message_id),
+            return_exceptions=True,
+        )
+
+        if isinstance(delete_result, Exception):
+            logger.warning(
+                f"Could not delete challenge message: {str(delete_result)}",
                 extra={
-                    "chat_id": challenge["chat_id"],
-                    "user_id": challenge["user_id"],
+                    "chat_id": challenge.chat_id,
                     "message_id": message_id,
-                    "event_type": "kick_failed",
-                    "error_type": type(e).__name__,
+                    "event_type": "delete_failed",
                 },
             )
-            # Don't proceed with cleanup if kick failed
-            return
 
-        # Then delete the challenge message
-        try:
-            await context.bot.delete_message(
-                chat_id=challenge["chat_id"], message_id=challenge["message_id"]
-            )
-        except TelegramError as e:
-            logger.warning(
-                f"Could not delete challenge message: {str(e)}",
+        if kicked is True:
+            logger.info(
+                "User kicked due to timeout",
                 extra={
-                    "chat_id": challenge["chat_id"],
+                    "chat_id": challenge.chat_id,
+                    "user_id": challenge.user_id,
                     "message_id": message_id,
-                    "event_type": "delete_failed",
+                    "event_type": "challenge_timeout",
                 },
             )
 
-        storage.remove_challenge(message_id)
-
     except Exception as e:
         logger.error(
             f"Unexpected error in kick job: {str(e)}",
@@ -861,44 +1263,42 @@ async def kick_user_max_attempts(
 ):
     """Kick user when max attempts reached and cleanup challenge"""
     try:
-        # First kick the user
-        await context.bot.ban_chat_member(chat_id, user_id)
-        await context.bot.unban_chat_member(chat_id, user_id)
-
-        # Update message to show max attempts reached
-        try:
-            await context.bot.edit_message_text(
-                CHALLENGE_MAX_ATTEMPTS, chat_id=chat_id, message_id=message_id
-            )
+        # The kick and the challenge-message update are independent, so
+        # overlap them
+        kicked, edit_result = await asyncio.gather(
+            _kick_member(context.bot, chat_id, user_id, message_id),
+            context.bot.edit_message_text(
+                messages.CHALLENGE_MAX_ATTEMPTS, chat_id=chat_id, message_id=message_id
+            ),
+            return_exceptions=True,
+        )
 
-            # Schedule deletion of the failure message after 10 seconds
-            context.job_queue.run_once(
-                delete_welcome_message_job,
-                10,
-                data={"message_id": message_id, "chat_id": chat_id},
-            )
-        except TelegramError as e:
+        if isinstance(edit_result, Exception):
             logger.warning(
-                f"Could not update challenge message: {str(e)}",
+                f"Could not update challenge message: {str(edit_result)}",
                 extra={
                     "chat_id": chat_id,
                     "message_id": message_id,
                     "event_type": "update_failed",
                 },
             )
+        else:
+            # Schedule deletion of the failure message after 10 seconds
+            schedule_delete(chat_id, message_id, time.monotonic() + 10)
 
         # Remove challenge from storage
-        storage.remove_challenge(message_id)
+        await asyncio.to_thread(storage.remove_challenge, message_id)
 
-        logger.info(
-            "User kicked due to max attempts",
-            extra={
-                "chat_id": chat_id,
-                "user_id": user_id,
-                "message_id": message_id,
-                "event_type": "max_attempts_kick",
-            },
-        )
+        if kicked is True:
+            logger.info(
+                "User kicked due to max attempts",
+                extra={
+                    "chat_id": chat_id,
+                    "user_id": user_id,
+                    "message_id": message_id,
+                    "event_type": "max_attempts_kick",
+                },
+            )
     except TelegramError as e:
         logger.error(
             f"Error kicking user for max attempts: {str(e)}",
@@ -913,13 +1313,37 @@ async def kick_user_max_attempts(
         )
 
 
-async def delete_welcome_message_job(context: ContextTypes.DEFAULT_TYPE):
-    """Delete welcome message after 3 minutes"""
-    message_id = context.job.data["message_id"]
-    chat_id = context.job.data["chat_id"]
-
+# Overlapping cleanup paths (timeout kick, scheduled welcome deletion,
+# expired sweep) can target the same message; a duplicate deleteMessage
+# only burns a pool slot to get "message not found" back, so deletions
+# are deduped for a short window
+DELETE_DEDUPE_TTL = 120.0
+DELETE_DEDUPE_MAX = 10000
+_recently_deleted = {}  # (chat_id, message_id) -> monotonic stamp
+
+
+async def _delete_message_once(bot, chat_id: int, message_id: int) -> bool:
+    """delete_message, skipped when the same message was deleted recently"""
+    now = time.monotonic()
+    key = (chat_id, message_id)
+    stamp = _recently_deleted.get(key)
+    if stamp is not None and now - stamp < DELETE_DEDUPE_TTL:
+        return False
+    if len(_recently_deleted) > DELETE_DEDUPE_MAX:
+        cutoff = now - DELETE_DEDUPE_TTL
+        for old_key, old_stamp in list(_recently_deleted.items()):
+            if old_stamp < cutoff:
+                del _recently_deleted[old_key]
+    _recently_deleted[key] = now
+    await bot.delete_message(chat_id=chat_id, message_id=message_id)
+    return True
+
+
+async def delete_welcome_message(bot, chat_id: int, message_id: int):
+    """Delete a welcome/failure message once its display time is up"""
     try:
-        await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
+        if not await _delete_message_once(bot, chat_id, message_id):
+            return
         logger.info(
             "Deleted welcome message after timeout",
             extra={
@@ -941,8 +1365,43 @@ async def delete_welcome_message_job(context: ContextTypes.DEFAULT_TYPE):
 
 async def cleanup_job(context: ContextTypes.DEFAULT_TYPE):
     """Periodic cleanup of expired challenges and tracked users"""
-    storage.cleanup_expired()
-    storage.cleanup_expired_tracking()
+    # Skip the delete scans entirely when there is nothing to clean
+    if not await asyncio.to_thread(storage.has_pending):
+        return
+    # Single fused pass over both tables (one connection, one timestamp)
+    expired = await asyncio.to_thread(storage.cleanup)
+    if expired:
+        # Challenges that outlived their kick (e.g. across a restart)
+        # leave messages behind; clear them with bulk calls fired
+        # concurrently, chunked to deleteMessages' 100-id limit per call
+        by_chat = {}
+        for chat_id, message_id in expired:
+            by_chat.setdefault(chat_id, []).append(message_id)
+        batches = [
+            (chat_id, ids[start : start + 100])
+            for chat_id, ids in by_chat.items()
+            for start in range(0, len(ids), 100)
+        ]
+        results = await asyncio.gather(
+            *(
+                context.bot.delete_messages(chat_id=chat_id, message_ids=ids)
+                for chat_id, ids in batches
+            ),
+            return_exceptions=True,
+        )
+        for (chat_id, _), result in zip(batches, results):
+            if isinstance(result, Exception):
+                logger.debug(
+                    "Could not delete expired challenge messages in chat %s: %s",
+                    chat_id,
+                    result,
+                )
+
+
+# Mock ChatMember pairs reused across simulated joins so load tests
+# exercise restrict_new_member without churning allocations here
+_mock_member_cache = {}
+_MOCK_MEMBER_CACHE_MAX = 1024
 
 
 # Add debug commands if in debug mode
@@ -959,15 +1418,24 @@ async def debug_simulate_join(update: Update, context: ContextTypes.DEFAULT_TYPE
 
     logger.info(messages.DEBUG_SIMULATED_JOIN.format(user_id=user_id))
 
-    # Create mock member update
+    # Create mock member update, reusing the cached ChatMember pair
+    mock_members = _mock_member_cache.get(user_id)
+    if mock_members is None:
+        mock_members = (
+            ChatMember(user=update.effective_user, status="left"),
+            ChatMember(user=update.effective_user, status="member"),
+        )
+        if len(_mock_member_cache) < _MOCK_MEMBER_CACHE_MAX:
+            _mock_member_cache[user_id] = mock_members
+
     mock_update = Update(
         update.update_id,
         chat_member=ChatMemberUpdated(
             chat=update.effective_chat,
             from_user=update.effective_user,
             date=update.message.date,
-            old_chat_member=ChatMember(user=update.effective_user, status="left"),
-            new_chat_member=ChatMember(user=update.effective_user, status="member"),
+            old_chat_member=mock_members[0],
+            new_chat_member=mock_members[1],
         ),
     )
 
@@ -989,62 +1457,51 @@ async def health_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(messages.HEALTH_ACCESS_DENIED)
         return
 
-    uptime = datetime.now() - bot_health["start_time"]
-    uptime_hours = int(uptime.total_seconds() // 3600)
-    uptime_minutes = int((uptime.total_seconds() % 3600) // 60)
+    uptime_seconds = time.monotonic() - bot_health.start_monotonic
+    uptime_hours = int(uptime_seconds // 3600)
+    uptime_minutes = int((uptime_seconds % 3600) // 60)
     uptime_str = f"{uptime_hours}h {uptime_minutes}m"
 
     health_text = messages.HEALTH_STATUS_TEMPLATE.format(
-        status=bot_health["status"].upper(),
+        status=bot_health.status.upper(),
         uptime=uptime_str,
-        challenges_processed=bot_health["challenges_processed"],
-        errors_count=bot_health["errors_count"],
-        last_update=bot_health["last_update"].strftime("%H:%M:%S"),
+        challenges_processed=bot_health.challenges_processed,
+        errors_count=bot_health.errors_count,
+        last_update=_monotonic_to_datetime(bot_health.last_update_monotonic).strftime(
+            "%H:%M:%S"
+        ),
     )
 
     await update.message.reply_text(health_text, parse_mode="Markdown")
-    logger.info(f"Health status requested by admin {user_id}")
+    logger.info("Health status requested by admin %s", user_id)
 
 
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Log the error and send a telegram message to notify the developer."""
     # Update error count
-    bot_health["errors_count"] += 1
-    bot_health["last_update"] = datetime.now()
-
-    # Log the error before we do anything else, so we can see it even if something breaks.
-    logger.error("Exception while handling an update:", exc_info=context.error)
-
-    # Get the error traceback
-    tb_list = traceback.format_exception(
-        None, context.error, context.error.__traceback__
-    )
-    tb_string = "".join(tb_list)
-
-    # Build the message with some markup and additional information
-    update_str = update.to_dict() if isinstance(update, Update) else str(update)
-    # message = ERROR_REPORT.format(  # For future use
-    #     update=html.escape(json.dumps(update_str, indent=2, ensure_ascii=False)),
-    #     chat_data=html.escape(str(context.chat_data)),
-    #     user_data=html.escape(str(context.user_data)),
-    #     traceback=html.escape(tb_string)
-    # )
+    bot_health.errors_count += 1
+    bot_health.last_update_monotonic = time.monotonic()
 
+    # One structured record; exc_info lets the formatter materialize the
+    # traceback only when a handler actually emits the record, instead of
+    # building the full traceback string and update dict up front
     logger.error(
-        "Exception occurred",
+        "Exception while handling an update",
         extra={
-            "update": update_str,
             "error": str(context.error),
-            "traceback": tb_string,
+            "update_id": update.update_id if isinstance(update, Update) else None,
             "event_type": "exception",
         },
+        exc_info=context.error,
     )
 
 
 async def start_http_server():
     """Start the HTTP server"""
     app = await create_http_server()
-    runner = web.AppRunner(app)
+    # No access log: health probes every few seconds would otherwise emit
+    # a log record each through the handler chain
+    runner = web.AppRunner(app, access_log=None)
     await runner.setup()
 
     site = web.TCPSite(runner, "0.0.0.0", HTTP_PORT)
@@ -1063,22 +1520,12 @@ def setup_bot_handlers(app):
         ChatMemberHandler(restrict_new_member, ChatMemberHandler.CHAT_MEMBER)
     )
     app.add_handler(
-        MessageHandler(
-            filters.ChatType.GROUPS & filters.StatusUpdate.NEW_CHAT_MEMBERS,
-            restrict_new_member,
-        )
+        CallbackQueryHandler(handle_answer_callback, pattern=ANSWER_CALLBACK_RE)
     )
-    app.add_handler(CallbackQueryHandler(handle_answer_callback, pattern=r"^answer_"))
 
-    # Add spam detection handler for regular text messages
-    # Always add the handler - it will check if DeepSeek is available when it runs
-    app.add_handler(
-        MessageHandler(
-            filters.ChatType.GROUPS & filters.TEXT & ~filters.COMMAND,
-            handle_user_message,
-        )
-    )
-    logger.info("Added spam detection message handler")
+    # The spam detection message handler is registered in post_init once
+    # DeepSeek availability is known, so group text never dispatches a
+    # handler that would immediately bail out in basic-protection mode
 
     # Add error handler
     logger.debug(messages.LOG_ERROR_HANDLER_SETUP)
@@ -1086,7 +1533,7 @@ def setup_bot_handlers(app):
 
     # Add periodic cleanup job
     logger.debug(messages.LOG_CLEANUP_JOB_SETUP)
-    app.job_queue.run_repeating(cleanup_job, interval=60)
+    app.job_queue.run_repeating(cleanup_job, interval=300, first=60)
 
     if debug_mode:
         logger.info(messages.LOG_DEBUG_MODE)
@@ -1100,44 +1547,70 @@ def setup_lifecycle_hooks(app):
     """Setup bot lifecycle hooks"""
     # Global variable to store HTTP runner
     http_runner = None
+    sweeper_task = None
 
     async def post_init(application):
         """Initialize HTTP server and DeepSeek after bot initialization"""
-        nonlocal http_runner
+        nonlocal http_runner, sweeper_task
+        global JOIN_SEMAPHORE
         try:
-            # Initialize DeepSeek connection
+            JOIN_SEMAPHORE = asyncio.Semaphore(JOIN_SEMAPHORE_LIMIT)
             logger.info(f"Bot username: @{application.bot.username}")
-            await initialize_deepseek()
 
-            # Log final protection status
+            # The DeepSeek connection test and the healthcheck port bind
+            # are independent; overlap them so cold start takes the max
+            # of the two instead of their sum
+            ds_result, http_result = await asyncio.gather(
+                initialize_deepseek(), start_http_server(), return_exceptions=True
+            )
+            if isinstance(ds_result, BaseException):
+                logger.error(f"DeepSeek initialization failed: {ds_result}")
+            if isinstance(http_result, BaseException):
+                raise http_result
+            http_runner = http_result
+
+            # Log final protection status and only wire up the spam
+            # detection handler when there is a client to back it
             if is_deepseek_available():
+                application.add_handler(
+                    MessageHandler(SPAM_TEXT_FILTER, handle_user_message)
+                )
+                logger.info("Added spam detection message handler")
                 logger.info("🛡️ Full protection: Emoji challenges + AI spam detection")
             else:
                 logger.info("🛡️ Basic protection: Emoji challenges only")
 
-            # Start HTTP server
-            http_runner = await start_http_server()
-            bot_health["status"] = "running"
-            bot_health["last_update"] = datetime.now()
+            # Start the kick/deletion sweeper on the bot's event loop
+            sweeper_task = asyncio.create_task(timer_sweeper(application))
+
+            bot_health.status = "running"
+            bot_health.last_update_monotonic = time.monotonic()
             logger.info("Bot and HTTP server initialization complete")
             logger.info("Bot is ready to process updates")
         except Exception as e:
             logger.error(f"Failed to start HTTP server: {e}")
-            bot_health["status"] = "error"
+            bot_health.status = "error"
             raise
 
     async def post_stop(application):
         """Cleanup HTTP server when bot stops"""
         nonlocal http_runner
+        if sweeper_task:
+            sweeper_task.cancel()
         if http_runner:
             try:
                 logger.info("Shutting down HTTP server...")
-                bot_health["status"] = "stopping"
+                bot_health.status = "stopping"
                 await http_runner.cleanup()
                 logger.info("HTTP server shutdown complete")
             except Exception as e:
                 logger.error(f"Error during HTTP server shutdown: {e}")
 
+        # PTB routes SIGTERM/SIGINT through its own shutdown, which ends
+        # here — push buffered records out so a container stop doesn't
+        # drop the last seconds of logs
+        flush_log_handlers()
+
     # Set up lifecycle hooks
     app.post_init = post_init
     app.post_stop = post_stop
@@ -1150,10 +1623,44 @@ def main():
     try:
         logger.info(messages.BOT_INIT_MESSAGE)
 
+        # Use uvloop when available: a drop-in libuv-backed event loop
+        # that speeds up all of the bot's socket I/O
+        try:
+            import uvloop
+
+            uvloop.install()
+            logger.info("uvloop event loop installed")
+        except ImportError:
+            logger.debug("uvloop not available, using default event loop")
+
         # DeepSeek will be initialized after bot starts
 
-        # Create the bot application
-        app = ApplicationBuilder().token(BOT_TOKEN).build()
+        # Create the bot application. concurrent_updates lets handlers for
+        # different updates run as parallel tasks (bounded at 32 in flight)
+        # instead of PTB's default serial loop, so one slow Bot API call
+        # during a join storm doesn't head-of-line block everything else.
+        # The enlarged HTTPX connection pool lets those concurrent handlers'
+        # outbound Bot API calls actually fly in parallel instead of
+        # queueing on a handful of connections; getUpdates keeps its own
+        # small pool so polling never competes with handler traffic.
+        app = (
+            ApplicationBuilder()
+            .token(BOT_TOKEN)
+            .concurrent_updates(32)
+            .connection_pool_size(64)
+            .pool_timeout(10)
+            .connect_timeout(10.0)
+            .read_timeout(20.0)
+            .get_updates_connection_pool_size(2)
+            # Queue outbound calls client-side at Telegram's global limit
+            # instead of getting throttled with 429s during join storms
+            .rate_limiter(
+                AIORateLimiter(
+                    overall_max_rate=30, overall_time_period=1, max_retries=3
+                )
+            )
+            .build()
+        )
 
         # Setup handlers
         setup_bot_handlers(app)
@@ -1164,25 +1671,39 @@ def main():
         # Log initial startup status
         logger.info(messages.BOT_INIT_COMPLETE)
 
-        # Run the bot (this handles the event loop properly)
-        app.run_polling(
-            allowed_updates=[
-                Update.MESSAGE,
-                Update.CHAT_MEMBER,
-                Update.MY_CHAT_MEMBER,
-                Update.CALLBACK_QUERY,
-            ],
-            drop_pending_updates=True,
-        )
+        # Run the bot (this handles the event loop properly).
+        # Webhook mode avoids the getUpdates round-trip entirely: Telegram
+        # pushes each update to us, so there is no polling latency and no
+        # idle HTTP traffic between updates.
+        if WEBHOOK_URL:
+            logger.info(f"Starting in webhook mode on port {WEBHOOK_PORT}")
+            app.run_webhook(
+                listen="0.0.0.0",
+                port=WEBHOOK_PORT,
+                url_path=BOT_TOKEN,
+                webhook_url=f"{WEBHOOK_URL.rstrip('/')}/{BOT_TOKEN}",
+                secret_token=WEBHOOK_SECRET_TOKEN or None,
+                allowed_updates=ALLOWED_UPDATE_TYPES,
+                drop_pending_updates=True,
+            )
+        else:
+            # Long-poll getUpdates for up to 50s and re-poll immediately:
+            # an idle chat costs ~1 request/minute instead of ~6
+            app.run_polling(
+                timeout=50,
+                poll_interval=0,
+                bootstrap_retries=-1,
+                allowed_updates=ALLOWED_UPDATE_TYPES,
+                drop_pending_updates=True,
+            )
 
     except Exception as e:
-        bot_health["status"] = "error"
-        bot_health["errors_count"] += 1
+        bot_health.status = "error"
+        bot_health.errors_count += 1
         logger.critical(
             "Fatal error during bot startup",
             extra={
                 "error": str(e),
-                "traceback": traceback.format_exc(),
                 "event_type": "startup_error",
             },
             exc_info=True,
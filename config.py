@@ -21,6 +21,17 @@ HTTP_PORT = int(os.getenv("HTTP_PORT", "10000"))  # HTTP server port
 MAX_ATTEMPTS = 2  # Maximum number of wrong attempts before kicking user
 CHALLENGE_TIMEOUT = 180  # Challenge timeout in seconds (3 minutes)
 
+# =====================================
+# WEBHOOK CONFIGURATION
+# =====================================
+# Public HTTPS base URL for webhook mode (e.g. "https://bot.example.com").
+# When set, Telegram pushes updates to the bot instead of the bot long
+# polling. Leave empty to use long polling (the default).
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+# Optional secret passed back by Telegram in X-Telegram-Bot-Api-Secret-Token
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN", "")
+
 # =====================================
 # CHAT RESTRICTIONS
 # =====================================
@@ -71,6 +82,39 @@ SPAM_DETECTION_PROMPT = """
 строгим к коммерции.
 """
 
+# Variant of the prompt used when several messages arrive within the
+# batching window and are classified in a single API call
+SPAM_DETECTION_BATCH_PROMPT = """
+Ты - бот модератор Telegram канала товарищества собственников жилых домов, \
+где люди обсуждают вопросы ЖКХ, дома, двора и соседства.
+
+ЗАДАЧА: Определи для каждого сообщения из списка, является ли оно \
+спамом/рекламой.
+
+СЧИТАЕТСЯ СПАМОМ:
+• Прямая реклама товаров/услуг с ценами, контактами, призывами купить
+• Предложения работы/подработки/заработка
+• Ссылки на внешние ресурсы/каналы/группы
+• Финансовые схемы, инвестиции, криптовалюта
+• Многоуровневый маркетинг (МЛМ)
+• Повторяющиеся однотипные сообщения
+
+НЕ ЯВЛЯЕТСЯ СПАМОМ:
+• Обсуждение проблем дома/двора/ЖКХ
+• Поиск/предложение помощи соседям (ремонт, присмотр за животными и т.д.)
+• Продажа/обмен личных вещей между соседями
+• Рекомендации мастеров/услуг от соседей (без навязывания)
+• Обычное общение, даже с нецензурной лексикой
+• Новости района/города
+
+Сообщения:
+{messages}
+
+Ответь для каждого сообщения на отдельной строке в формате "N: SPAM" или \
+"N: CLEAN" (N - номер сообщения). Будь снисходительным к соседскому \
+общению, строгим к коммерции.
+"""
+
 # =====================================
 # ADMIN CONFIGURATION
 # =====================================
@@ -79,14 +123,15 @@ SPAM_DETECTION_PROMPT = """
 # Example: ADMIN_USER_IDS="123456789,987654321"
 ADMIN_USER_IDS_STR = os.getenv("ADMIN_USER_IDS", "")
 
-# Parse admin user IDs from environment variable
-ADMIN_USER_IDS = []
+# Parse admin user IDs from environment variable into a frozenset so
+# the per-command membership check is O(1) and the set is safely shared
+ADMIN_USER_IDS = frozenset()
 if ADMIN_USER_IDS_STR:
     try:
-        ADMIN_USER_IDS = [
+        ADMIN_USER_IDS = frozenset(
             int(uid.strip()) for uid in ADMIN_USER_IDS_STR.split(",") if uid.strip()
-        ]
+        )
         print(f"✅ Loaded {len(ADMIN_USER_IDS)} admin user IDs from environment")
     except ValueError as e:
         print(f"❌ Invalid ADMIN_USER_IDS format: {e}")
-        ADMIN_USER_IDS = []
+        ADMIN_USER_IDS = frozenset()
@@ -2,7 +2,11 @@
 DeepSeek API integration for spam detection
 """
 import asyncio
+import hashlib
 import logging
+import re
+from collections import OrderedDict
+from typing import Optional
 
 # Import configuration
 from config import (
@@ -11,6 +15,7 @@ from config import (
     DEEPSEEK_MODEL,
     SPAM_DETECTION_ENABLED,
     SPAM_DETECTION_PROMPT,
+    SPAM_DETECTION_BATCH_PROMPT,
 )
 
 logger = logging.getLogger(__name__)
@@ -26,6 +31,14 @@ except ImportError:
 # Initialize DeepSeek client (will be validated during startup)
 deepseek_client = None
 
+# Pre-split the prompt templates once: per call the message is spliced in
+# with two C-level concatenations instead of str.format scanning the whole
+# (long) template for placeholders
+_PROMPT_PREFIX, _PROMPT_SUFFIX = SPAM_DETECTION_PROMPT.split("{message}")
+_BATCH_PROMPT_PREFIX, _BATCH_PROMPT_SUFFIX = SPAM_DETECTION_BATCH_PROMPT.split(
+    "{messages}"
+)
+
 
 async def test_deepseek_connection() -> bool:
     """Test DeepSeek API connection and validate API key"""
@@ -42,17 +55,19 @@ async def test_deepseek_connection() -> bool:
         return False
 
     try:
-        # Initialize DeepSeek client (using OpenAI-compatible interface)
-        test_client = openai.OpenAI(
-            api_key=DEEPSEEK_API_KEY, base_url=DEEPSEEK_BASE_URL
+        # Initialize DeepSeek client (using OpenAI-compatible interface).
+        # AsyncOpenAI keeps one pooled HTTP client alive for the process,
+        # so spam checks reuse TCP/TLS connections instead of hopping to a
+        # worker thread per call
+        test_client = openai.AsyncOpenAI(
+            api_key=DEEPSEEK_API_KEY, base_url=DEEPSEEK_BASE_URL, timeout=10.0
         )
 
         logger.info("Testing DeepSeek API connection...")
 
         # Test with a simple completion request
         logger.debug("🤖 Testing DeepSeek API with test request...")
-        response = await asyncio.to_thread(
-            test_client.chat.completions.create,
+        response = await test_client.chat.completions.create(
             model=DEEPSEEK_MODEL,
             messages=[
                 {"role": "system", "content": "You are a test system."},
@@ -63,9 +78,10 @@ async def test_deepseek_connection() -> bool:
         )
 
         result = response.choices[0].message.content.strip()
-        logger.debug(f"🤖 DeepSeek test response: '{result}'")
+        logger.debug("🤖 DeepSeek test response: '%s'", result)
         logger.debug(
-            f"🤖 Test tokens used: {response.usage.total_tokens if response.usage else 'N/A'}"
+            "🤖 Test tokens used: %s",
+            response.usage.total_tokens if response.usage else "N/A",
         )
 
         if "TEST" in result.upper():
@@ -95,26 +111,152 @@ async def test_deepseek_connection() -> bool:
         return False
 
 
+# Spam checks arriving within the batching window are coalesced into one
+# API call: the shared system/criteria prompt is billed once per batch and
+# a burst of N messages costs one round-trip instead of N
+BATCH_WINDOW = 0.2  # seconds to wait for more messages before submitting
+BATCH_MAX_MESSAGES = 10  # messages per combined prompt
+
+# Batch answer lines in the 'N: SPAM' / 'N: CLEAN' format the prompt asks for
+_BATCH_VERDICT_RE = re.compile(r"^\s*(\d+)\s*:\s*(SPAM|CLEAN)", re.IGNORECASE)
+
+_pending_checks = []  # list of (message_text, future) awaiting a verdict
+_drain_task = None
+
+# Exact-match verdict cache: spammers paste identical ad text across many
+# users and chats, so repeats skip the API (and its token cost) entirely.
+# Single-threaded asyncio access, so no locking is needed.
+VERDICT_CACHE_MAX = 4096
+_verdict_cache = OrderedDict()  # normalized-text hash -> bool
+
+
+def _verdict_key(message_text: str) -> bytes:
+    return hashlib.blake2b(
+        message_text.strip().lower().encode("utf-8"), digest_size=16
+    ).digest()
+
+
 async def detect_spam_with_deepseek(message_text: str) -> bool:
     """Use DeepSeek to detect if a message is spam/advertisement"""
     if not deepseek_client:
         return False  # If DeepSeek not available, assume not spam
 
+    key = _verdict_key(message_text)
+    cached = _verdict_cache.get(key)
+    if cached is not None:
+        _verdict_cache.move_to_end(key)
+        logger.debug("Spam verdict cache hit: %s", cached)
+        return cached
+
+    global _drain_task
+    future = asyncio.get_running_loop().create_future()
+    _pending_checks.append((message_text, future))
+    if _drain_task is None or _drain_task.done():
+        _drain_task = asyncio.ensure_future(_drain_spam_checks())
+    verdict = await future
+
+    # Errors come back as None: fail open for this message, but don't cache
+    # the fail-open verdict - the cache has no TTL, so a transient API error
+    # would otherwise whitelist this text forever
+    if verdict is None:
+        return False
+
+    _verdict_cache[key] = verdict
+    if len(_verdict_cache) > VERDICT_CACHE_MAX:
+        _verdict_cache.popitem(last=False)
+    return verdict
+
+
+async def _drain_spam_checks():
+    """Classify everything queued during the batching window"""
+    await asyncio.sleep(BATCH_WINDOW)
+    while _pending_checks:
+        batch = _pending_checks[:BATCH_MAX_MESSAGES]
+        del _pending_checks[:BATCH_MAX_MESSAGES]
+
+        if len(batch) == 1:
+            verdicts = [await _classify_message(batch[0][0])]
+        else:
+            verdicts = await _classify_batch([text for text, _ in batch])
+
+        for (_, future), verdict in zip(batch, verdicts):
+            if not future.done():
+                future.set_result(verdict)
+
+
+async def _classify_batch(message_texts) -> list:
+    """Classify several messages with a single numbered-list completion.
+
+    Returns one verdict per message; None marks messages whose check failed.
+    """
     try:
-        prompt = SPAM_DETECTION_PROMPT.format(message=message_text)
+        numbered = "\n".join(
+            f'{i}. "{text}"' for i, text in enumerate(message_texts, 1)
+        )
+        prompt = _BATCH_PROMPT_PREFIX + numbered + _BATCH_PROMPT_SUFFIX
 
-        # Log the request details
-        logger.debug(f"🤖 DeepSeek API Request:")
-        logger.debug(f"  Model: {DEEPSEEK_MODEL}")
-        logger.debug(
-            f"  System prompt: Ты система определения спама для Telegram чатов."
+        response = await deepseek_client.chat.completions.create(
+            model=DEEPSEEK_MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "Ты система определения спама для Telegram чатов.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            max_tokens=10 * len(message_texts),
+            temperature=0.1,
         )
-        logger.debug(f"  User prompt: {prompt}")
-        logger.debug(f"  Message to analyze: '{message_text}'")
-        logger.debug(f"  Max tokens: 10, Temperature: 0.1")
 
-        response = await asyncio.to_thread(
-            deepseek_client.chat.completions.create,
+        result = response.choices[0].message.content.strip()
+        # Assign verdicts by the N index the prompt mandates, not by line
+        # position: a skipped or merged line would otherwise shift every
+        # following verdict onto the wrong message. Messages without a
+        # cleanly numbered verdict stay None (error, not a CLEAN verdict)
+        # so they fail open without being cached
+        verdicts = [None] * len(message_texts)
+        for line in result.splitlines():
+            match = _BATCH_VERDICT_RE.match(line)
+            if match:
+                index = int(match.group(1)) - 1
+                if 0 <= index < len(verdicts):
+                    verdicts[index] = match.group(2).upper() == "SPAM"
+        unanswered = sum(v is None for v in verdicts)
+        if unanswered:
+            logger.warning(
+                f"DeepSeek batch left {unanswered} of {len(message_texts)} "
+                f"messages without a numbered verdict"
+            )
+
+        logger.info(
+            f"Batch spam detection: {sum(v is True for v in verdicts)}"
+            f"/{len(message_texts)} messages flagged as spam"
+        )
+        return verdicts
+
+    except Exception as e:
+        logger.error(f"Error in DeepSeek batch spam detection: {str(e)}")
+        return [None] * len(message_texts)
+
+
+async def _classify_message(message_text: str) -> Optional[bool]:
+    """Classify a single message (non-batched path); None means the check failed"""
+    try:
+        prompt = _PROMPT_PREFIX + message_text + _PROMPT_SUFFIX
+
+        # Log the request details; the guard skips even argument
+        # evaluation for this multi-line dump when DEBUG is filtered out
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🤖 DeepSeek API Request:")
+            logger.debug("  Model: %s", DEEPSEEK_MODEL)
+            logger.debug(
+                "  System prompt: Ты система определения спама для Telegram чатов."
+            )
+            logger.debug("  User prompt: %s", prompt)
+            logger.debug("  Message to analyze: '%s'", message_text)
+            logger.debug("  Max tokens: 10, Temperature: 0.1")
+
+        response = await deepseek_client.chat.completions.create(
             model=DEEPSEEK_MODEL,
             messages=[
                 {
@@ -131,19 +273,18 @@ async def detect_spam_with_deepseek(message_text: str) -> bool:
         result = response.choices[0].message.content.strip()
         is_spam = "SPAM" in result.upper()
 
-        logger.debug(f"🤖 DeepSeek API Response:")
-        logger.debug(f"  Raw response: '{result}'")
-        logger.debug(
-            f"  Tokens used: {response.usage.total_tokens if response.usage else 'N/A'}"
-        )
-        logger.debug(
-            f"  Prompt tokens: {response.usage.prompt_tokens if response.usage else 'N/A'}"
-        )
-        logger.debug(
-            f"  Completion tokens: {response.usage.completion_tokens if response.usage else 'N/A'}"
-        )
-        logger.debug(f"  Finish reason: {response.choices[0].finish_reason}")
-        logger.debug(f"  Spam detected: {is_spam}")
+        if logger.isEnabledFor(logging.DEBUG):
+            usage = response.usage
+            logger.debug("🤖 DeepSeek API Response:")
+            logger.debug("  Raw response: '%s'", result)
+            logger.debug("  Tokens used: %s", usage.total_tokens if usage else "N/A")
+            logger.debug("  Prompt tokens: %s", usage.prompt_tokens if usage else "N/A")
+            logger.debug(
+                "  Completion tokens: %s",
+                usage.completion_tokens if usage else "N/A",
+            )
+            logger.debug("  Finish reason: %s", response.choices[0].finish_reason)
+            logger.debug("  Spam detected: %s", is_spam)
 
         logger.info(
             f"Spam detection result: '{result}' -> {'SPAM' if is_spam else 'SAFE'} "
@@ -153,8 +294,8 @@ async def detect_spam_with_deepseek(message_text: str) -> bool:
 
     except Exception as e:
         logger.error(f"Error in DeepSeek spam detection: {str(e)}")
-        logger.debug(f"Failed message was: '{message_text}'")
-        return False  # If error, assume not spam to avoid false positives
+        logger.debug("Failed message was: '%s'", message_text)
+        return None  # Error sentinel: caller fails open without caching
 
 
 def is_deepseek_available() -> bool:
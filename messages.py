@@ -123,6 +123,7 @@ LOG_DEBUG_MODE = "Running in debug mode"
 
 # Spam detection messages
 SPAM_DETECTED_KICK = "🚫 Пользователь удален за отправку рекламы/спама"
+SPAM_DETECTED_KICK_MANY = "🚫 Удалено пользователей за рекламу/спам: {count}"
 SPAM_DETECTION_ERROR = "⚠️ Ошибка при проверке сообщения на спам"
 
 # Admin command messages
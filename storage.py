@@ -1,17 +1,61 @@
 import sqlite3
 import logging
-from datetime import datetime
+import time
 import threading
+from collections import OrderedDict
 from contextlib import contextmanager
+from typing import NamedTuple
 
 logger = logging.getLogger(__name__)
 
 
+class Challenge(NamedTuple):
+    """Active challenge row; attribute access is cheaper than dict keys"""
+
+    message_id: int
+    chat_id: int
+    user_id: int
+    answer: int
+    attempts: int
+    created_at: float
+    expires_at: float
+
+
+class TrackedUser(NamedTuple):
+    """User monitored for spam after completing a challenge"""
+
+    chat_id: int
+    user_id: int
+    message_count: int
+    joined_at: float
+    expires_at: float
+
+
 class ChallengeStorage:
+    # Explicit column lists keep row unpacking stable against schema
+    # drift and let SELECTs use covering index plans
+    CHALLENGE_COLS = (
+        "message_id, chat_id, user_id, answer, attempts, created_at, expires_at"
+    )
+    TRACKED_COLS = "chat_id, user_id, message_count, joined_at, expires_at"
+
     def __init__(self, db_path="challenges.db"):
         self.db_path = "db/challenges.db"
+        # Protects only the in-memory challenge cache; database access
+        # is lock-free - each thread owns its connection and SQLite
+        # serializes writers itself via busy_timeout
         self.lock = threading.Lock()
+        self._local = threading.local()
         self._init_db()
+        # In-memory superset of tracked (chat_id, user_id) pairs so the
+        # per-message hot path can reject untracked users without a
+        # database round-trip; may briefly contain expired entries,
+        # which the authoritative queries below still filter out
+        self._tracked_index = self._load_tracked_index()
+        # Small LRU of recent Challenge rows: answer retries hit the
+        # same message_id in quick succession, so most get_challenge
+        # calls become a dict lookup instead of a SQLite round-trip
+        self._challenge_cache = OrderedDict()
 
     def _init_db(self):
         """Initialize the database with required tables"""
@@ -24,8 +68,8 @@ class ChallengeStorage:
                     user_id INTEGER NOT NULL,
                     answer INTEGER NOT NULL,
                     attempts INTEGER NOT NULL DEFAULT 0,
-                    created_at TIMESTAMP NOT NULL,
-                    expires_at TIMESTAMP NOT NULL
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
                 )
             """
             )
@@ -37,23 +81,82 @@ class ChallengeStorage:
                     chat_id INTEGER NOT NULL,
                     user_id INTEGER NOT NULL,
                     message_count INTEGER NOT NULL DEFAULT 0,
-                    joined_at TIMESTAMP NOT NULL,
-                    expires_at TIMESTAMP NOT NULL,
+                    joined_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
                     PRIMARY KEY (chat_id, user_id)
                 )
             """
             )
-            conn.commit()
+
+            # Indexes so the expiry sweeps and per-user lookups are
+            # seeks instead of full table scans as rows accumulate
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_challenges_expires "
+                "ON challenges(expires_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_challenges_user "
+                "ON challenges(chat_id, user_id, expires_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_tracked_expires "
+                "ON tracked_users(expires_at)"
+            )
+
+    def _load_tracked_index(self):
+        """Load the tracked-user membership index from the database"""
+        with self._get_connection() as conn:
+            cursor = conn.execute("SELECT chat_id, user_id FROM tracked_users")
+            return set(cursor.fetchall())
+
+    def is_tracked(self, chat_id: int, user_id: int) -> bool:
+        """Cheap membership pre-check; False means definitely not tracked"""
+        return (chat_id, user_id) in self._tracked_index
+
+    CHALLENGE_CACHE_MAX = 256
+
+    def _cache_store(self, challenge):
+        """Remember a challenge row"""
+        with self.lock:
+            cache = self._challenge_cache
+            cache[challenge.message_id] = challenge
+            cache.move_to_end(challenge.message_id)
+            if len(cache) > self.CHALLENGE_CACHE_MAX:
+                cache.popitem(last=False)
+
+    def _cache_drop(self, message_id):
+        """Forget a (possibly absent) cached row"""
+        with self.lock:
+            self._challenge_cache.pop(message_id, None)
+
+    def _connect(self):
+        """Open a connection with the performance PRAGMAs applied"""
+        # isolation_level=None puts the connection in autocommit mode:
+        # each statement is its own transaction with no explicit
+        # commit() round-trip; bulk paths open transactions explicitly
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        # WAL lets readers proceed while a writer commits, and NORMAL
+        # sync is safe under WAL while skipping an fsync per commit
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-32000")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
 
     @contextmanager
     def _get_connection(self):
-        """Thread-safe database connection context manager"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            try:
-                yield conn
-            finally:
-                conn.close()
+        """Access to a long-lived per-thread connection, no locking.
+
+        Each thread reuses its own connection for the life of the
+        process. Under WAL, readers on different connections proceed
+        concurrently with a writer, and concurrent writers queue inside
+        SQLite on the 5s busy_timeout rather than on a Python lock.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        yield conn
 
     def add_challenge(
         self,
@@ -64,36 +167,80 @@ class ChallengeStorage:
         expires_in_seconds: int = 180,
     ):
         """Add a new challenge to storage"""
-        created_at = datetime.now()
-        expires_at = datetime.now().timestamp() + expires_in_seconds
+        created_at = time.time()
+        expires_at = created_at + expires_in_seconds
+
+        with self._get_connection() as conn:
+            # OR IGNORE turns the duplicate case into a rowcount check
+            # instead of exception-based control flow
+            cursor = conn.execute(
+                """
+                INSERT OR IGNORE INTO challenges
+                (message_id, chat_id, user_id, answer, attempts,
+                 created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    message_id,
+                    chat_id,
+                    user_id,
+                    answer,
+                    0,
+                    created_at,
+                    expires_at,
+                ),
+            )
+            if cursor.rowcount == 0:
+                logger.warning(
+                    f"Challenge with message_id {message_id} " f"already exists"
+                )
+                return
+            self._cache_store(
+                Challenge(
+                    message_id=message_id,
+                    chat_id=chat_id,
+                    user_id=user_id,
+                    answer=answer,
+                    attempts=0,
+                    created_at=created_at,
+                    expires_at=expires_at,
+                )
+            )
+            logger.debug("Added challenge for message %s to database", message_id)
+
+    def add_challenges(self, rows, expires_in_seconds: int = 180):
+        """Bulk-add challenges in one statement and one transaction.
 
+        ``rows`` holds (message_id, chat_id, user_id, answer) tuples;
+        they share a single clock sample and duplicates are ignored,
+        amortizing parse/commit cost across a join burst.
+        """
+        if not rows:
+            return
+        created_at = time.time()
+        expires_at = created_at + expires_in_seconds
         with self._get_connection() as conn:
+            # One explicit transaction so the burst commits once even
+            # though the connection is otherwise in autocommit mode
+            conn.execute("BEGIN")
             try:
-                conn.execute(
+                conn.executemany(
                     """
-                    INSERT INTO challenges
+                    INSERT OR IGNORE INTO challenges
                     (message_id, chat_id, user_id, answer, attempts,
                      created_at, expires_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    VALUES (?, ?, ?, ?, 0, ?, ?)
                     """,
-                    (
-                        message_id,
-                        chat_id,
-                        user_id,
-                        answer,
-                        0,
-                        created_at.isoformat(),
-                        expires_at,
-                    ),
-                )
-                conn.commit()
-                logger.debug(
-                    f"Added challenge for message {message_id} " f"to database"
-                )
-            except sqlite3.IntegrityError:
-                logger.warning(
-                    f"Challenge with message_id {message_id} " f"already exists"
+                    [
+                        (message_id, chat_id, user_id, answer, created_at, expires_at)
+                        for message_id, chat_id, user_id, answer in rows
+                    ],
                 )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            logger.debug("Added %s challenges to database", len(rows))
 
     def increment_attempts(self, message_id: int) -> int:
         """Increment attempt count for a challenge and return new count"""
@@ -113,73 +260,148 @@ class ChallengeStorage:
                     f"non-existent challenge {message_id}"
                 )
                 return 0
-            conn.commit()
+            self._cache_drop(message_id)
             return row[0]
 
     def get_challenge(self, message_id: int):
         """Get challenge by message ID"""
+        with self.lock:
+            cached = self._challenge_cache.get(message_id)
+            if cached is not None:
+                self._challenge_cache.move_to_end(message_id)
+                return cached
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                f"SELECT {self.CHALLENGE_COLS} FROM challenges " "WHERE message_id = ?",
+                (message_id,),
+            )
+            row = cursor.fetchone()
+            if row:
+                challenge = Challenge._make(row)
+                self._cache_store(challenge)
+                return challenge
+            return None
+
+    def pop_challenge(self, message_id: int):
+        """Atomically fetch and remove a challenge in one round-trip"""
         with self._get_connection() as conn:
             cursor = conn.execute(
-                "SELECT * FROM challenges WHERE message_id = ?", (message_id,)
+                "DELETE FROM challenges WHERE message_id = ? "
+                f"RETURNING {self.CHALLENGE_COLS}",
+                (message_id,),
             )
             row = cursor.fetchone()
+            self._cache_drop(message_id)
             if row:
-                return {
-                    "message_id": row[0],
-                    "chat_id": row[1],
-                    "user_id": row[2],
-                    "answer": row[3],
-                    "attempts": row[4] if row[4] is not None else 0,
-                    "created_at": datetime.fromisoformat(str(row[5])),
-                    "expires_at": row[6],
-                }
+                return Challenge._make(row)
             return None
 
     def remove_challenge(self, message_id: int):
         """Remove a challenge from storage"""
         with self._get_connection() as conn:
             conn.execute("DELETE FROM challenges WHERE message_id = ?", (message_id,))
-            conn.commit()
-            logger.debug(f"Removed challenge {message_id} from database")
+            self._cache_drop(message_id)
+            logger.debug("Removed challenge %s from database", message_id)
+
+    def remove_challenges(self, message_ids):
+        """Remove several challenges in a single statement"""
+        if not message_ids:
+            return
+        with self._get_connection() as conn:
+            conn.executemany(
+                "DELETE FROM challenges WHERE message_id = ?",
+                [(message_id,) for message_id in message_ids],
+            )
+            for message_id in message_ids:
+                self._cache_drop(message_id)
+            logger.debug("Removed %s challenges from database", len(message_ids))
+
+    def has_pending(self) -> bool:
+        """Check whether any challenges or tracked users exist at all"""
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                "SELECT EXISTS(SELECT 1 FROM challenges) "
+                "OR EXISTS(SELECT 1 FROM tracked_users)"
+            )
+            return bool(cursor.fetchone()[0])
 
     def cleanup_expired(self):
-        """Remove all expired challenges"""
-        current_time = datetime.now().timestamp()
+        """Remove all expired challenges and return their (chat_id,
+        message_id) pairs so callers can clean up the messages too"""
+        current_time = time.time()
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                "DELETE FROM challenges WHERE expires_at < ? "
+                "RETURNING chat_id, message_id",
+                (current_time,),
+            )
+            rows = cursor.fetchall()
+            for _, message_id in rows:
+                self._cache_drop(message_id)
+            return rows
+
+    # Expired rows are deleted in bounded batches so a large backlog
+    # (e.g. after downtime) never holds the write lock in one long
+    # transaction; each batch commits before the next starts
+    CLEANUP_BATCH = 500
+
+    def _delete_expired_batched(self, conn, table, key, returning, now):
+        """Delete expired rows from one table in batches; returns rows"""
+        deleted = []
+        sql = (
+            "DELETE FROM {table} WHERE {key} IN "
+            "(SELECT {key} FROM {table} WHERE expires_at < ? LIMIT ?) "
+            "RETURNING {returning}"
+        ).format(table=table, key=key, returning=returning)
+        while True:
+            batch = conn.execute(sql, (now, self.CLEANUP_BATCH)).fetchall()
+            deleted.extend(batch)
+            if len(batch) < self.CLEANUP_BATCH:
+                return deleted
+
+    def cleanup(self):
+        """Fused cleanup pass: remove expired challenges and expired
+        tracked users over one connection with one shared timestamp.
+
+        Returns the (chat_id, message_id) pairs of removed challenges.
+        """
+        current_time = time.time()
         with self._get_connection() as conn:
-            conn.execute("DELETE FROM challenges WHERE expires_at < ?", (current_time,))
-            conn.commit()
+            challenge_rows = self._delete_expired_batched(
+                conn, "challenges", "message_id", "chat_id, message_id", current_time
+            )
+            for _, message_id in challenge_rows:
+                self._cache_drop(message_id)
+            expired_tracked = self._delete_expired_batched(
+                conn, "tracked_users", "rowid", "chat_id, user_id", current_time
+            )
+            if expired_tracked:
+                self._tracked_index.difference_update(expired_tracked)
+                logger.debug(
+                    "Cleaned up %s expired tracked users", len(expired_tracked)
+                )
+            return challenge_rows
 
     def get_user_challenges(self, chat_id: int, user_id: int):
         """Get all active challenges for a user in a chat"""
         with self._get_connection() as conn:
             cursor = conn.execute(
-                """
-                SELECT * FROM challenges
+                f"""
+                SELECT {self.CHALLENGE_COLS} FROM challenges
                 WHERE chat_id = ? AND user_id = ? AND expires_at > ?
                 """,
-                (chat_id, user_id, datetime.now().timestamp()),
+                (chat_id, user_id, time.time()),
             )
-            results = []
-            for row in cursor.fetchall():
-                results.append(
-                    {
-                        "message_id": row[0],
-                        "chat_id": row[1],
-                        "user_id": row[2],
-                        "answer": row[3],
-                        "attempts": row[4] if row[4] is not None else 0,
-                        "created_at": datetime.fromisoformat(str(row[5])),
-                        "expires_at": row[6],
-                    }
-                )
-            return results
+            # Iterate the cursor directly; fetchall would build an
+            # intermediate list of raw rows just to throw it away
+            return [Challenge._make(row) for row in cursor]
 
     def add_tracked_user(
         self, chat_id: int, user_id: int, tracking_duration: int = 86400
     ):
         """Add a user to spam tracking after they complete challenge"""
-        joined_at = datetime.now()
-        expires_at = joined_at.timestamp() + tracking_duration
+        joined_at = time.time()
+        expires_at = joined_at + tracking_duration
 
         with self._get_connection() as conn:
             try:
@@ -189,10 +411,12 @@ class ChallengeStorage:
                     (chat_id, user_id, message_count, joined_at, expires_at)
                     VALUES (?, ?, ?, ?, ?)
                     """,
-                    (chat_id, user_id, 0, joined_at.isoformat(), expires_at),
+                    (chat_id, user_id, 0, joined_at, expires_at),
+                )
+                self._tracked_index.add((chat_id, user_id))
+                logger.debug(
+                    "Added user %s to spam tracking in chat %s", user_id, chat_id
                 )
-                conn.commit()
-                logger.debug(f"Added user {user_id} to spam tracking in chat {chat_id}")
             except Exception as e:
                 logger.error(f"Error adding tracked user: {e}")
 
@@ -205,33 +429,26 @@ class ChallengeStorage:
                     "WHERE chat_id = ? AND user_id = ? AND expires_at > ? "
                     "RETURNING message_count"
                 ),
-                (chat_id, user_id, datetime.now().timestamp()),
+                (chat_id, user_id, time.time()),
             )
             row = cursor.fetchone()
             if not row:
                 return -1  # User not tracked or expired
-            conn.commit()
             return row[0]
 
     def get_tracked_user(self, chat_id: int, user_id: int):
         """Get tracked user info if they're still being monitored"""
         with self._get_connection() as conn:
             cursor = conn.execute(
-                """
-                SELECT * FROM tracked_users
+                f"""
+                SELECT {self.TRACKED_COLS} FROM tracked_users
                 WHERE chat_id = ? AND user_id = ? AND expires_at > ?
                 """,
-                (chat_id, user_id, datetime.now().timestamp()),
+                (chat_id, user_id, time.time()),
             )
             row = cursor.fetchone()
             if row:
-                return {
-                    "chat_id": row[0],
-                    "user_id": row[1],
-                    "message_count": row[2],
-                    "joined_at": datetime.fromisoformat(str(row[3])),
-                    "expires_at": row[4],
-                }
+                return TrackedUser._make(row)
             return None
 
     def remove_tracked_user(self, chat_id: int, user_id: int):
@@ -241,17 +458,21 @@ class ChallengeStorage:
                 "DELETE FROM tracked_users WHERE chat_id = ? AND user_id = ?",
                 (chat_id, user_id),
             )
-            conn.commit()
-            logger.debug(f"Removed user {user_id} from spam tracking in chat {chat_id}")
+            self._tracked_index.discard((chat_id, user_id))
+            logger.debug(
+                "Removed user %s from spam tracking in chat %s", user_id, chat_id
+            )
 
     def cleanup_expired_tracking(self):
         """Remove expired tracked users"""
-        current_time = datetime.now().timestamp()
+        current_time = time.time()
         with self._get_connection() as conn:
             cursor = conn.execute(
-                "DELETE FROM tracked_users WHERE expires_at < ?", (current_time,)
+                "DELETE FROM tracked_users WHERE expires_at < ? "
+                "RETURNING chat_id, user_id",
+                (current_time,),
             )
-            deleted_count = cursor.rowcount
-            conn.commit()
-            if deleted_count > 0:
-                logger.debug(f"Cleaned up {deleted_count} expired tracked users")
+            expired = cursor.fetchall()
+            if expired:
+                self._tracked_index.difference_update(expired)
+                logger.debug("Cleaned up %s expired tracked users", len(expired))